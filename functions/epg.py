@@ -7,9 +7,56 @@
 # [UPDATED] 2025-12-24
 # ==============================================================================
 
+import gzip
+import os
+import shutil
+import subprocess
+import xml.etree.ElementTree as StdET
 from pathlib import Path
 
-def write_xml(epg_xml: str, file_path: str):
+try:
+    from lxml import etree as LxmlET  # serializes in libxml2
+except ImportError:
+    LxmlET = None
+
+def _xml_bytes(epg_xml) -> bytes:
+    """UTF-8 document bytes from a string, or from an lxml / stdlib element or tree."""
+    if isinstance(epg_xml, bytes):
+        return epg_xml
+    if isinstance(epg_xml, str):
+        return epg_xml.encode("utf-8")
+    if LxmlET is not None and isinstance(epg_xml, (LxmlET._Element, LxmlET._ElementTree)):
+        return LxmlET.tostring(epg_xml, xml_declaration=True, encoding="utf-8")
+    root = epg_xml.getroot() if isinstance(epg_xml, StdET.ElementTree) else epg_xml
+    return StdET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+def write_xml(epg_xml, file_path: str):
+    Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(epg_xml, str):
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(epg_xml)
+        return
+    with open(file_path, "wb") as f:
+        f.write(_xml_bytes(epg_xml))
+
+def write_xml_gz(epg_xml, file_path: str):
+    """
+    Gzip-compressed write_xml: deflated by pigz across all cores when it is on PATH,
+    else by stdlib gzip at the same level (6).
+    """
     Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(epg_xml)
+    data = _xml_bytes(epg_xml)
+    pigz = shutil.which("pigz")
+    if pigz:
+        with open(file_path, "wb") as f_out:
+            proc = subprocess.Popen([pigz, "-p", str(os.cpu_count() or 1), "-c"], stdin=subprocess.PIPE, stdout=f_out)
+            try:
+                proc.stdin.write(data)
+            finally:
+                proc.stdin.close()
+                rc = proc.wait()
+        if rc:
+            raise subprocess.CalledProcessError(rc, pigz)
+    else:
+        with gzip.open(file_path, "wb", compresslevel=6) as f_out:
+            f_out.write(data)
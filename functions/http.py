@@ -7,26 +7,98 @@
 # [UPDATED] 2025-12-24
 # ==============================================================================
 
+import json
+import os
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 
-def fetch(url: str, cache_file: Path, user_agent: str = None):
+# One pooled keep-alive session for every fetch/HEAD (no TCP+TLS handshake per call);
+# the pool is sized for the default head_ok_many concurrency. No adapter-level retries:
+# _head_ok runs its own retry loop, and stacking both multiplies attempts and timeouts.
+_POOL_SIZE = 32
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=_POOL_SIZE, max_retries=0)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+# Cached files younger than the TTL are served without a request; anything smaller than
+# _MIN_BYTES is treated as a leftover from an interrupted run and fetched again.
+_CACHE_TTL_SEC = 6 * 3600
+_MIN_BYTES = 64
+
+def _meta_path(cache_file: Path) -> Path:
+    return cache_file.with_suffix(cache_file.suffix + ".meta")
+
+def _load_validators(cache_file: Path) -> dict:
+    try:
+        return json.loads(_meta_path(cache_file).read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def fetch(url: str, cache_file: Path, user_agent: str = None, ttl_sec: int = None):
     cache_file.parent.mkdir(parents=True, exist_ok=True)
-    if cache_file.exists():
+    ttl_sec = _CACHE_TTL_SEC if ttl_sec is None else ttl_sec
+    try:
+        st = cache_file.stat()
+        cached = st.st_size >= _MIN_BYTES
+    except FileNotFoundError:
+        cached = False
+    if cached and time.time() - st.st_mtime < ttl_sec:
         return str(cache_file)
-    headers = {"User-Agent": user_agent or "StreamLedger/1.0"}
-    response = requests.get(url, timeout=30, headers=headers)
-    response.raise_for_status()
-    cache_file.write_bytes(response.content)
+    validators = _load_validators(cache_file) if cached else {}
+
+    headers = {"User-Agent": user_agent or "StreamLedger/1.0", "Accept-Encoding": "gzip, deflate"}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    try:
+        with _SESSION.get(url, timeout=30, headers=headers, stream=True) as response:
+            if cached and response.status_code == 304:
+                os.utime(cache_file)  # restart the TTL
+                return str(cache_file)
+            response.raise_for_status()
+            # write aside and swap in, so an interrupted download never replaces a good cache
+            part_file = cache_file.with_name(cache_file.name + ".part")
+            try:
+                with open(part_file, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
+                os.replace(part_file, cache_file)
+            finally:
+                if part_file.exists():
+                    part_file.unlink()
+            meta = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    except requests.RequestException:
+        if cached:
+            return str(cache_file)
+        raise
+
+    if meta["etag"] or meta["last_modified"]:
+        _meta_path(cache_file).write_text(json.dumps(meta), encoding="utf-8")
+    else:
+        _meta_path(cache_file).unlink(missing_ok=True)
     return str(cache_file)
 
 def head_ok(url: str, validation_cfg: dict) -> bool:
-    timeout = validation_cfg.get("timeout_sec", 10)
-    retries = validation_cfg.get("retries", 1)
+    return _head_ok(url, validation_cfg.get("timeout_sec", 10), validation_cfg.get("retries", 1))
+
+def head_ok_many(urls, validation_cfg: dict) -> dict:
+    """HEAD-check many URLs concurrently; returns {url: ok}. Repeated URLs are checked once."""
+    urls = list(dict.fromkeys(urls))
+    workers = max(1, min(int(validation_cfg.get("concurrency", _POOL_SIZE)), len(urls)))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return dict(zip(urls, ex.map(lambda u: head_ok(u, validation_cfg), urls)))
+
+def _head_ok(url: str, timeout, retries) -> bool:
     headers = {"User-Agent": "StreamLedger/1.0"}
     for _ in range(retries + 1):
         try:
-            r = requests.head(url, timeout=timeout, headers=headers, allow_redirects=True)
+            r = _SESSION.head(url, timeout=timeout, headers=headers, allow_redirects=True)
             if r.status_code == 200:
                 return True
         except Exception:
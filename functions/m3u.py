@@ -7,52 +7,75 @@
 # [UPDATED] 2025-12-24
 # ==============================================================================
 
+import mmap
+import os
 import re
 
+# One scan over the mapped file: EXTINF line + the URL line directly after it
+# (\n, \r\n and bare \r all end a line, as with text-mode line iteration)
+_EXTINF_URL_RX = re.compile(rb'(?:^|(?<=\r))[ \t]*#EXTINF:([^\r\n]*)(?:\r\n|\r|\n)[ \t]*(http[^\r\n]*)', re.M)
+_ATTR_RX = re.compile(rb'([\w-]+)="([^"]*)"')
+_PAREN_RX = re.compile(r'\s+[\[\(].*?[\]\)]')
+_LEADING_FLAGS_RX = re.compile(r'^\(\?([aiLmsux]+)\)')
+
+def _text(raw: bytes) -> str:
+    return raw.decode("utf-8", errors="ignore")
+
 def read_entries(file_path: str):
     entries = []
-    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-        lines = f.readlines()
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        if line.startswith("#EXTINF:"):
-            info = line
-            i += 1
-            if i < len(lines):
-                url_line = lines[i].strip()
-                if url_line.startswith("http"):
-                    attrs = {}
-                    parts = info[8:].split(" ", 1)
-                    if len(parts) > 1:
-                        attr_str = parts[0]
-                        name = parts[1].split(",", 1)[-1] if "," in parts[1] else parts[1]
-                        for pair in attr_str.split(" "):
-                            if "=" in pair:
-                                k, v = pair.split("=", 1)
-                                attrs[k] = v.strip('"')
-                    else:
-                        name = info.split(",", 1)[-1] if "," in info else ""
-                    entries.append({"name": name.strip(), "url": url_line, **attrs})
-        i += 1
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return entries
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for m in _EXTINF_URL_RX.finditer(mm):
+                info, url = m.group(1), m.group(2)
+                attrs = {}
+                attrs_end = 0
+                for a in _ATTR_RX.finditer(info):
+                    attrs[_text(a.group(1))] = _text(a.group(2))
+                    attrs_end = a.end()
+                # display name follows the first comma after the last key="value" attribute
+                # (quotes inside the title itself do not move it)
+                comma = info.find(b",", attrs_end)
+                name = info[comma + 1:] if comma >= 0 else b""
+                entries.append({"name": _text(name).strip(), "url": _text(url).strip(), **attrs})
     return entries
 
 def normalize_name(name: str) -> str:
-    name = re.sub(r'\s+[\[\(].*?[\]\)]', '', name)
+    name = _PAREN_RX.sub('', name)
     return name.strip().lower()
 
-def match_region(name: str, regions: dict) -> bool:
+def build_region_index(regions: dict) -> tuple:
+    """Flatten every region's locations/markets/allow_suffix into one tuple of lowercased substrings (once per run)."""
+    return tuple(dict.fromkeys(
+        loc.lower()
+        for data in regions.values()
+        for key in ("locations", "markets", "allow_suffix")
+        for loc in data.get(key, [])
+    ))
+
+def compile_alternation(patterns):
+    # one alternation, so each name is scanned once however many patterns there are; a leading
+    # global flag group such as "(?i)" becomes a scoped one, as globals are only legal at the start
+    parts = []
+    for p in patterns or []:
+        m = _LEADING_FLAGS_RX.match(p)
+        parts.append(f"(?{m.group(1)}:{p[m.end():]})" if m else f"(?:{p})")
+    return re.compile("|".join(parts)) if parts else None
+
+def match_region(name: str, region_index: tuple) -> bool:
     lower = name.lower()
-    for data in regions.values():
-        locations = data.get("locations", []) + data.get("markets", []) + data.get("allow_suffix", [])
-        if any(loc.lower() in lower for loc in locations):
-            return True
-    return False
+    return any(loc in lower for loc in region_index)
+
+def format_m3u(channels: list) -> str:
+    """The whole playlist as one string: every entry formatted into one list, joined once."""
+    parts = ["#EXTM3U\n"]
+    for ch in channels:
+        attrs = " ".join(f'{k}="{v}"' for k, v in ch.items() if k not in ("name", "url"))
+        parts.append(f'#EXTINF:-1 {attrs},{ch["name"]}\n{ch["url"]}\n')
+    return "".join(parts)
 
 def write_m3u(channels: list, file_path: str):
+    # one write of the finished blob instead of two buffered writes per channel
     with open(file_path, "w", encoding="utf-8") as f:
-        f.write("#EXTM3U\n")
-        for ch in channels:
-            attrs = " ".join(f'{k}="{v}"' for k, v in ch.items() if k not in ["name", "url"])
-            f.write(f'#EXTINF:-1 {attrs},{ch["name"]}\n')
-            f.write(f'{ch["url"]}\n')
+        f.write(format_m3u(channels))
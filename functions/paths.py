@@ -7,6 +7,7 @@
 # [UPDATED] 2025-12-24
 # ==============================================================================
 
+import os
 from pathlib import Path
 import shutil
 from datetime import datetime
@@ -19,11 +20,35 @@ def cache_path(url: str) -> Path:
 def outputs_path(filename: str) -> str:
     return str(BASE_DIR / "outputs" / filename)
 
+def _clone_file(src: str, dst: str) -> None:
+    """
+    copy2 equivalent. os.copy_file_range lets the kernel share extents on CoW filesystems
+    (btrfs/xfs reflink) or copy in-kernel elsewhere; falls back to shutil.copy2.
+    """
+    copy_range = getattr(os, "copy_file_range", None)
+    if copy_range is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    n = copy_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if n == 0:
+                        break
+                    remaining -= n
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
 def archive_previous():
     outputs = BASE_DIR / "outputs"
+    if not outputs.exists():
+        return
     archive = BASE_DIR / "archive" / datetime.now().strftime("%Y%m%d_%H%M%S")
-    if outputs.exists():
-        archive.mkdir(parents=True, exist_ok=True)
-        for file in outputs.iterdir():
-            if file.is_file():
-                shutil.copy(file, archive / file.name)
+    archive.mkdir(parents=True, exist_ok=True)
+    archive_dir = str(archive)
+    with os.scandir(outputs) as it:
+        for ent in it:
+            if ent.is_file(follow_symlinks=False):
+                _clone_file(ent.path, os.path.join(archive_dir, ent.name))
@@ -13,6 +13,7 @@ StreamLedger — Build EPG (Production Step 2)
 Purpose
 - Build a minimized EPG file containing only channels (and programmes) relevant to outputs/curated.m3u.
 - Merge multiple EPG sources using streaming XML parsing (iterparse) to reduce memory usage.
+- Scan sources in parallel worker processes; priority between sources is still applied in config order.
 - Update outputs/report.json with EPG coverage metrics.
 - Treat EPG coverage as a knob (warn below soft threshold; hard-fail only below catastrophic threshold).
 
@@ -30,6 +31,7 @@ Config Keys (streamledger.yml)
 - pipeline.epg_coverage_soft_min
 - pipeline.epg_coverage_hard_fail_below
 - validation.light.timeout_sec  (used for downloads)
+- validation.cache_ttl_sec      (cached EPG sources younger than this skip the network)
 - epg.match_priority (documented; current implementation uses tvg-id then normalized display-name)
 
 Matching Strategy (Practical)
@@ -48,17 +50,64 @@ Change Log
 
 from __future__ import annotations
 
+import codecs
 import gzip
+import hashlib
+import html
+import io
 import json
 import logging
+import mmap
+import os
+import pickle
 import re
+import shutil
+import string
+import subprocess
+import sys
 import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from xml.parsers import expat
 
 import requests
-import xml.etree.ElementTree as ET
 import yaml
+from requests.adapters import HTTPAdapter
+
+try:
+    # libxml2 pull parser: tag filtering happens in C, far fewer Python objects per element.
+    from lxml import etree as ET
+    HAVE_LXML = True
+except ImportError:  # pragma: no cover - stdlib fallback keeps the step runnable
+    import xml.etree.ElementTree as ET
+    HAVE_LXML = False
+
+try:
+    # libyaml-backed loader when PyYAML was built with it; same safe subset, C speed
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    # optional: Rust JSON codec for report.json (bytes in/out, no str round trip)
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # optional: block-parallel gunzip for large .xml.gz sources
+    import rapidgzip
+except ImportError:
+    rapidgzip = None
+
+try:
+    # optional: ISA-L SIMD inflate/deflate; igzip reads .gz sources, igzip_threaded writes the final .xml.gz
+    from isal import igzip, igzip_threaded
+except ImportError:
+    igzip = igzip_threaded = None
 
 # ----------------------------
 # Paths
@@ -67,17 +116,24 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 CONFIG_PATH = BASE_DIR / "config" / "streamledger.yml"
 OUTPUTS_DIR = BASE_DIR / "outputs"
 CACHE_DIR = BASE_DIR / "cache" / "epg"
+INDEX_CACHE_DIR = CACHE_DIR / "index"
 TEMP_DIR = BASE_DIR / "temp"
 LOG_DIR = BASE_DIR / "logs"
 
-for d in (OUTPUTS_DIR, CACHE_DIR, TEMP_DIR, LOG_DIR):
+for d in (OUTPUTS_DIR, CACHE_DIR, INDEX_CACHE_DIR, TEMP_DIR, LOG_DIR):
     d.mkdir(parents=True, exist_ok=True)
 
 CURATED_M3U = OUTPUTS_DIR / "curated.m3u"
 OUT_GZ = OUTPUTS_DIR / "curated_epg.xml.gz"
-TMP_XML = TEMP_DIR / "curated_epg.xml"
 REPORT_JSON = OUTPUTS_DIR / "report.json"
 
+READ_CHUNK = 1024 * 1024
+COPY_CHUNK = 1024 * 1024
+WRITE_BUFFER = 1024 * 1024
+PROGRAMME_BATCH = 4 * 1024 * 1024  # serialized programmes held before one joined write
+PROGRAMME_SCAN_LIMIT = 16 * 1024 * 1024  # a single <programme> larger than this is not plausible
+INDEX_CACHE_VERSION = 1  # bump when the index shape or norm() changes
+
 # ----------------------------
 # Logging
 # ----------------------------
@@ -90,8 +146,26 @@ logging.basicConfig(
 # ----------------------------
 # Regex helpers
 # ----------------------------
-TVG_ID_RX = re.compile(r'tvg-id="([^"]*)"')
-TVG_NAME_RX = re.compile(r'tvg-name="([^"]*)"')
+# One scan per #EXTINF line: (line, tvg-id, tvg-name, text after the first comma).
+# The attributes are captured from lookaheads, so their order on the line does not matter.
+EXTINF_RX = re.compile(
+    rb'^[ \t]*(#EXTINF:'
+    rb'(?=(?:[^\r\n]*?tvg-id="([^"]*)")?)'
+    rb'(?=(?:[^\r\n]*?tvg-name="([^"]*)")?)'
+    rb'(?=[^\r\n,]*,([^\r\n]*))?'
+    rb'[^\r\n]*)',
+    re.M,
+)
+
+# Byte-level <programme> scanning: a whole element (self-closing or not) with its attributes,
+# and the channel attribute within them. Quoted values may legally contain ">".
+PROGRAMME_BLOCK_RX = re.compile(
+    rb'<programme((?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*)\s*(?:/>|>.*?</programme\s*>)',
+    re.S,
+)
+PROGRAMME_CHANNEL_RX = re.compile(rb'\schannel\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+# Whitespace and comments allowed between programmes
+PROGRAMME_GAP_RX = re.compile(rb'(?:\s+|<!--.*?-->)*', re.S)
 
 # ----------------------------
 # YAML / Report
@@ -99,12 +173,14 @@ TVG_NAME_RX = re.compile(r'tvg-name="([^"]*)"')
 
 def load_cfg() -> dict:
     with CONFIG_PATH.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+        return yaml.load(f, Loader=YamlLoader) or {}
 
 
 def load_report() -> dict:
     if REPORT_JSON.exists():
         try:
+            if orjson is not None:
+                return orjson.loads(REPORT_JSON.read_bytes())
             return json.loads(REPORT_JSON.read_text(encoding="utf-8"))
         except Exception:
             return {}
@@ -112,6 +188,9 @@ def load_report() -> dict:
 
 
 def write_report(rep: dict) -> None:
+    if orjson is not None:
+        REPORT_JSON.write_bytes(orjson.dumps(rep, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
     REPORT_JSON.write_text(json.dumps(rep, indent=2, ensure_ascii=False), encoding="utf-8")
 
 
@@ -124,62 +203,220 @@ def add_warning(rep: dict, msg: str) -> None:
 # Normalization
 # ----------------------------
 
+_WS_RX = re.compile(r"\s+")
+_NON_WORD_RX = re.compile(r"[^\w ]+")
+# ASCII chars that [^\w ] would strip (everything but letters, digits, "_" and space)
+_NORM_KEEP = frozenset(string.ascii_letters + string.digits + "_ ")
+_NORM_DROP = str.maketrans({chr(c): None for c in range(128) if chr(c) not in _NORM_KEEP})
+
+
+@lru_cache(maxsize=65536)
 def norm(s: str) -> str:
+    """
+    Lowercase, collapse whitespace, drop punctuation.
+    Display-names repeat heavily across sources, hence the cache; ASCII input skips the regexes.
+    """
     s = (s or "").strip().lower()
-    s = re.sub(r"\s+", " ", s)
-    s = re.sub(r"[^\w ]+", "", s)
-    return s
+    if s.isascii():
+        return " ".join(s.split()).translate(_NORM_DROP)
+    s = _WS_RX.sub(" ", s)
+    return _NON_WORD_RX.sub("", s)
 
 
 # ----------------------------
 # Download (resilient)
 # ----------------------------
 
-def http_get_to_file(url: str, dest: Path, user_agent: str, timeout_sec: int) -> Tuple[bool, str]:
+# One keep-alive session for all downloads: sources sharing a host skip the TCP+TLS handshake.
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
+
+# Cache hits need a file of at least this size (smaller = interrupted run) inside the TTL
+CACHE_TTL_SEC = 6 * 3600
+MIN_CACHE_BYTES = 64
+
+
+def meta_path(dest: Path) -> Path:
+    """Sidecar holding the HTTP validators (ETag / Last-Modified) of a cached download."""
+    return dest.with_name(dest.name + ".meta")
+
+
+def load_validators(dest: Path) -> dict:
+    try:
+        return json.loads(meta_path(dest).read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def http_get_to_file(
+    url: str,
+    dest: Path,
+    user_agent: str,
+    timeout_sec: int,
+    validators: Optional[dict] = None,
+) -> Tuple[bool, str]:
     """
     Returns (ok, reason). Never raises.
+    With validators, sends a conditional GET; a 304 leaves dest untouched (reason "not_modified").
+    The body is streamed to a .part file and renamed over dest only once complete.
     """
+    headers = {"User-Agent": user_agent, "Accept-Encoding": "gzip, deflate"}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    part = dest.with_name(dest.name + ".part")
     try:
-        r = requests.get(url, timeout=timeout_sec, headers={"User-Agent": user_agent}, stream=True)
-        if r.status_code >= 400:
-            return False, f"http={r.status_code}"
-        with dest.open("wb") as f:
-            for chunk in r.iter_content(chunk_size=1024 * 256):
-                if chunk:
-                    f.write(chunk)
-        if dest.exists() and dest.stat().st_size > 0:
-            return True, "ok"
-        return False, "empty"
+        with SESSION.get(url, timeout=timeout_sec, headers=headers, stream=True) as r:
+            if r.status_code == 304 and validators:
+                os.utime(dest)  # restart the TTL
+                return True, "not_modified"
+            if r.status_code >= 400:
+                return False, f"http={r.status_code}"
+            with part.open("wb") as f:
+                for chunk in r.iter_content(chunk_size=COPY_CHUNK):
+                    if chunk:
+                        f.write(chunk)
+            meta = {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+        if part.stat().st_size < MIN_CACHE_BYTES:
+            return False, "empty"
+        os.replace(part, dest)
+        if meta["etag"] or meta["last_modified"]:
+            meta_path(dest).write_text(json.dumps(meta), encoding="utf-8")
+        else:
+            meta_path(dest).unlink(missing_ok=True)
+        return True, "ok"
     except Exception as e:
         return False, f"exc={type(e).__name__}"
-
-
-def download_epg(url: str, user_agent: str, timeout_sec: int, retries: int) -> Tuple[Optional[Path], str]:
+    finally:
+        if part.exists():
+            part.unlink()
+
+
+def download_epg(
+    url: str,
+    user_agent: str,
+    timeout_sec: int,
+    retries: int,
+    ttl_sec: int = CACHE_TTL_SEC,
+) -> Tuple[Optional[Path], str]:
     """
     Download an EPG source into cache. Supports .xml and .xml.gz.
+    A cached copy within ttl_sec is used as-is; an older one with stored validators is
+    revalidated (conditional GET) instead of re-downloaded.
     Returns (path_or_none, reason). Never raises.
     """
     dest = CACHE_DIR / Path(url).name
 
-    # Cache hit
-    if dest.exists() and dest.stat().st_size > 0:
+    # Cache hit (fresh, and large enough not to be a truncated leftover)
+    try:
+        st = dest.stat()
+        cached = st.st_size >= MIN_CACHE_BYTES
+    except FileNotFoundError:
+        cached = False
+    if cached and time.time() - st.st_mtime < ttl_sec:
         return dest, "cache_hit"
+    validators = load_validators(dest) if cached else {}
 
     last_reason = "unknown"
     for _ in range(max(1, retries + 1)):
-        ok, reason = http_get_to_file(url, dest, user_agent=user_agent, timeout_sec=timeout_sec)
+        ok, reason = http_get_to_file(url, dest, user_agent=user_agent, timeout_sec=timeout_sec, validators=validators)
         last_reason = reason
         if ok:
             return dest, reason
         time.sleep(0.25)
 
+    # revalidation failed: keep serving the cached copy
+    if cached:
+        return dest, f"cache_hit_stale:{last_reason}"
     return None, last_reason
 
 
+# ----------------------------
+# Per-source workers
+# ----------------------------
+
+def run_per_source(fn, *arg_lists) -> list:
+    """
+    Call fn once per EPG source across worker processes (parsing + gunzip are CPU-bound).
+    Results come back in source order so priority handling stays deterministic.
+    """
+    n = len(arg_lists[0])
+    if n <= 1:
+        return list(map(fn, *arg_lists))
+    with ProcessPoolExecutor(max_workers=min(n, os.cpu_count() or 1)) as ex:
+        return list(ex.map(fn, *arg_lists))
+
+
+@contextmanager
 def open_xml_stream(path: Path):
-    if path.name.lower().endswith(".gz"):
-        return gzip.open(path, "rb")
-    return path.open("rb")
+    """
+    Binary reader over an EPG file, inflating .gz with the fastest available option:
+    rapidgzip (parallel), then a pigz subprocess (inflates on another core while we parse),
+    then ISA-L igzip, then stdlib gzip.
+    """
+    if not path.name.lower().endswith(".gz"):
+        with path.open("rb") as f:
+            yield f
+        return
+
+    pigz = shutil.which("pigz")
+    if rapidgzip is not None:
+        with rapidgzip.open(str(path), parallelization=os.cpu_count() or 1) as f:
+            yield f
+    elif pigz:
+        proc = subprocess.Popen(
+            [pigz, "-dc", str(path)], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=READ_CHUNK
+        )
+        try:
+            yield proc.stdout
+        finally:
+            # readers may stop early (the channel index ends at the first <programme>)
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            rc = proc.wait()
+        if rc > 0:
+            raise subprocess.CalledProcessError(rc, pigz)
+    elif igzip is not None:
+        with io.BufferedReader(igzip.open(path, "rb"), buffer_size=READ_CHUNK) as f:
+            yield f
+    else:
+        # GzipFile's own buffer is 8 KiB; a larger one cuts per-read zlib/syscall overhead
+        with io.BufferedReader(gzip.open(path, "rb"), buffer_size=READ_CHUNK) as f:
+            yield f
+
+
+def iter_elements(f, tags: Tuple[str, ...]):
+    """
+    Yield completed elements whose tag is in `tags`, releasing each one after the caller is done.
+    - lxml: tags are filtered inside libxml2 and already-processed siblings are detached from <tv>,
+      so memory stays flat regardless of file size. huge_tree lifts libxml2's per-node size and
+      depth limits, which large aggregated XMLTV dumps can exceed.
+    - stdlib: same contract, tag dispatch done in Python; <tv> is emptied after each hit since
+      el.clear() alone leaves the cleared husks attached to the root.
+    """
+    if HAVE_LXML:
+        for _ev, el in ET.iterparse(f, events=("end",), tag=tags, huge_tree=True):
+            yield el
+            el.clear(keep_tail=False)
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+        return
+
+    root = None
+    for ev, el in ET.iterparse(f, events=("start", "end")):
+        if root is None:
+            root = el
+        if ev == "end" and el.tag in tags:
+            yield el
+            el.clear()
+            root.clear()
 
 
 # ----------------------------
@@ -192,26 +429,27 @@ def parse_curated_targets(m3u_path: Path) -> Tuple[Set[str], Set[str]]:
       wanted_ids: tvg-id values (exact)
       wanted_names: normalized tvg-name/display-name fallback values
     """
-    wanted_ids: Set[str] = set()
-    wanted_names: Set[str] = set()
-
-    with m3u_path.open("r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            line = line.strip()
-            if not line.startswith("#EXTINF:"):
-                continue
-
-            m_id = TVG_ID_RX.search(line)
-            m_nm = TVG_NAME_RX.search(line)
-            tvg_id = (m_id.group(1) if m_id else "").strip()
-            tvg_name = (m_nm.group(1) if m_nm else "").strip()
-            disp = line.split(",", 1)[-1].strip()
-
-            if tvg_id:
-                wanted_ids.add(tvg_id)
-
-            wanted_names.add(norm(tvg_name or disp))
-
+    raw_ids: Set[bytes] = set()
+    raw_names: Set[Tuple[bytes, bytes]] = set()
+
+    def text(raw: bytes) -> str:
+        return raw.decode("utf-8", errors="ignore")
+
+    # mmap + one regex pass collecting raw bytes; the same channel listed several times
+    # (feeds, mirrors) is only decoded and normalized once, below
+    with m3u_path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return set(), set()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for m in EXTINF_RX.finditer(mm):
+                line, raw_id, raw_nm, raw_disp = m.groups()
+                if raw_id is not None:
+                    raw_ids.add(raw_id)
+                raw_names.add((raw_nm or b"", line if raw_disp is None else raw_disp))
+
+    wanted_ids = {text(b).strip() for b in raw_ids}
+    wanted_ids.discard("")
+    wanted_names = {norm(text(nm).strip() or text(disp).strip()) for nm, disp in raw_names}
     wanted_names.discard("")
     return wanted_ids, wanted_names
 
@@ -220,103 +458,462 @@ def parse_curated_targets(m3u_path: Path) -> Tuple[Set[str], Set[str]]:
 # EPG indexing
 # ----------------------------
 
-def index_epg_channels(epg_path: Path) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+class _ChannelsDone(Exception):
+    """Raised from the expat handler at the first <programme> to end the channel scan."""
+
+
+class _ResumedStream:
+    """Read-only file object: `head` bytes first, then whatever is left in `f`."""
+
+    def __init__(self, head: bytes, f):
+        self._head = head
+        self._pos = 0
+        self._f = f
+
+    def read(self, n: int = -1) -> bytes:
+        if self._pos >= len(self._head):
+            return self._f.read(n)
+        if n is None or n < 0:
+            out = self._head[self._pos:] + self._f.read()
+            self._pos = len(self._head)
+            return out
+        out = self._head[self._pos:self._pos + n]
+        self._pos += len(out)
+        return out
+
+
+_XML_DECL_ENCODING_RX = re.compile(rb'^<\?xml[^>]*?encoding\s*=\s*["\']([A-Za-z0-9._-]+)["\']')
+
+
+def ascii_compatible(head: bytes) -> bool:
     """
-    Returns:
-      id_to_display_norms: channel_id -> list of normalized display-name
-      id_to_channel_xml: channel_id -> serialized <channel> xml (utf-8)
+    True when markup in a document starting with `head` is plain ASCII bytes, i.e. tags can
+    be found and sliced by byte offset. False for UTF-16/32 (BOM, NUL-padded "<" or declared)
+    and for declared encodings that are unknown or not ASCII-compatible.
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return True
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE, codecs.BOM_UTF32_BE)) or b"\0" in head[:4]:
+        return False
+    m = _XML_DECL_ENCODING_RX.match(head)
+    if m is None:
+        return True  # no declaration: utf-8
+    try:
+        return "<?xml".encode(m.group(1).decode("ascii")) == b"<?xml"
+    except (LookupError, UnicodeError):
+        return False
+
+
+def _scan_channel_header_tree(
+    f,
+    keep_xml_ids: FrozenSet[str],
+) -> Tuple[Set[str], Dict[str, str], Dict[str, bytes]]:
+    """
+    scan_channel_header for sources that are not ASCII-compatible (UTF-16/32): the parser
+    decodes them and each kept <channel> is re-serialized as utf-8 with tostring.
+    Stops at the first <programme>, like the expat path.
+    """
+    channel_ids: Set[str] = set()
+    name_to_id: Dict[str, str] = {}
+    id_to_channel_xml: Dict[str, bytes] = {}
+
+    for el in iter_elements(f, ("channel", "programme")):
+        if el.tag == "programme":
+            break
+        cid = (el.get("id", "") or "").strip()
+        if not cid:
+            continue
+        channel_ids.add(cid)
+        for dn in el.iter("display-name"):
+            n = norm("".join(dn.itertext()))
+            if n:
+                name_to_id.setdefault(sys.intern(n), cid)
+        if cid in keep_xml_ids:
+            el.tail = None
+            id_to_channel_xml[cid] = ET.tostring(el, encoding="utf-8")
+
+    return channel_ids, name_to_id, id_to_channel_xml
+
+
+def scan_channel_header(
+    epg_path: Path,
+    keep_xml_ids: FrozenSet[str] = frozenset(),
+    on_body=None,
+) -> Tuple[Set[str], Dict[str, str], Dict[str, bytes]]:
     """
-    id_to_display_norms: Dict[str, List[str]] = {}
-    id_to_channel_xml: Dict[str, str] = {}
+    Returns:
+      channel_ids: every non-empty channel id
+      name_to_id: normalized display-name -> first channel id carrying it (document order)
+      id_to_channel_xml: channel_id -> raw <channel> xml bytes (utf-8), only for keep_xml_ids
+
+    Uses expat directly (buffer_text coalesces character data into one callback) and slices
+    each <channel> out of the raw input by byte offset instead of rebuilding it via tostring.
+
+    XMLTV puts all <channel> elements before the first <programme>, so the scan stops there.
+    With on_body, on_body(stream, encoding) is handed the still-open stream from that first
+    <programme> onwards, so the same decompression pass continues into the programmes.
 
+    Byte offsets only delimit elements in ASCII-compatible encodings; other sources (UTF-16/32)
+    are parsed with _scan_channel_header_tree instead, and on_body then gets a fresh stream
+    of the whole document with encoding None.
+    """
+    channel_ids: Set[str] = set()
+    name_to_id: Dict[str, str] = {}
+    id_to_channel_xml: Dict[str, bytes] = {}
+
+    p = expat.ParserCreate()
+    p.buffer_text = True
+    p.buffer_size = READ_CHUNK
+
+    raw = bytearray()  # input bytes from stream offset `base` onwards
+    base = 0
+    encoding = "utf-8"
+
+    cid: Optional[str] = None
+    start = 0
+    body_at = 0
+    text: Optional[List[str]] = None  # collecting <display-name> text when not None
+
+    def on_decl(_version, enc, _standalone):
+        nonlocal encoding
+        if enc:
+            encoding = enc.lower()
+
+    def on_start(name, attrs):
+        nonlocal cid, start, text, body_at
+        if name == "programme":
+            body_at = p.CurrentByteIndex
+            raise _ChannelsDone
+        if name == "channel":
+            cid = (attrs.get("id", "") or "").strip()
+            start = p.CurrentByteIndex
+            if cid:
+                channel_ids.add(cid)
+        elif name == "display-name" and cid:
+            text = []
+
+    def on_chars(data):
+        if text is not None:
+            text.append(data)
+
+    def on_end(name):
+        nonlocal cid, text
+        if name == "display-name" and text is not None:
+            n = norm("".join(text))
+            if n:
+                # interned: the same few names recur across channels and sources
+                name_to_id.setdefault(sys.intern(n), cid)
+            text = None
+        elif name == "channel" and cid is not None:
+            if cid in keep_xml_ids:
+                at = p.CurrentByteIndex - base
+                # </channel> reports its own offset; <channel .../> reports the offset just past it
+                end = raw.index(b">", at) + 1 if raw.startswith(b"</channel", at) else at
+                ch_xml = bytes(raw[start - base:end])
+                if encoding not in ("utf-8", "utf8", "us-ascii", "ascii"):
+                    ch_xml = ch_xml.decode(encoding, errors="ignore").encode("utf-8")
+                id_to_channel_xml[cid] = ch_xml
+            cid = None
+
+    p.XmlDeclHandler = on_decl
+    p.StartElementHandler = on_start
+    p.EndElementHandler = on_end
+    p.CharacterDataHandler = on_chars
+
+    tree_scan = False
     try:
         with open_xml_stream(epg_path) as f:
-            for _ev, el in ET.iterparse(f, events=("end",)):
-                if el.tag != "channel":
-                    continue
+            # enough bytes for a BOM and the whole XML declaration before deciding
+            chunk = f.read(max(READ_CHUNK, 1024))
+            while 0 < len(chunk) < 1024:
+                more = f.read(1024 - len(chunk))
+                if not more:
+                    break
+                chunk += more
+            tree_scan = not ascii_compatible(chunk)
+            if tree_scan:
+                channel_ids, name_to_id, id_to_channel_xml = _scan_channel_header_tree(
+                    _ResumedStream(chunk, f), keep_xml_ids
+                )
+            else:
+                try:
+                    while True:
+                        raw += chunk
+                        p.Parse(chunk, not chunk)
+                        if not chunk:
+                            break
+                        # keep the bytes of a <channel> still open, or of a tag expat has not finished yet
+                        if cid is not None:
+                            keep_from = start - base
+                        else:
+                            keep_from = raw.rfind(b"<")
+                            if keep_from < 0:
+                                keep_from = len(raw)
+                        del raw[:keep_from]
+                        base += keep_from
+                        chunk = f.read(READ_CHUNK)
+                except _ChannelsDone:
+                    if on_body is not None:
+                        on_body(_ResumedStream(bytes(raw[body_at - base:]), f), encoding)
+
+        if tree_scan and on_body is not None:
+            # the tree parser cannot hand over a byte position; programmes get their own pass
+            with open_xml_stream(epg_path) as f:
+                on_body(f, None)
+
+    except Exception as e:
+        logging.error("Index channels failed: %s :: %s", epg_path.name, e)
+
+    return channel_ids, name_to_id, id_to_channel_xml
 
-                cid = (el.attrib.get("id", "") or "").strip()
-                if not cid:
-                    el.clear()
-                    continue
 
-                norms: List[str] = []
-                for dn in el.findall("display-name"):
-                    n = norm(dn.text or "")
-                    if n:
-                        norms.append(n)
+def index_cache_path(epg_path: Path) -> Path:
+    """
+    Cache file for one source's channel index, keyed by the first 8 KiB of the file (the gzip
+    header carries the upstream mtime) plus its size, so a re-downloaded but unchanged EPG still hits.
+    """
+    with epg_path.open("rb") as f:
+        head = f.read(8192)
+    h = hashlib.blake2b(head, digest_size=12)
+    h.update(f"{epg_path.stat().st_size}:{INDEX_CACHE_VERSION}".encode("ascii"))
+    return INDEX_CACHE_DIR / f"{epg_path.name}.{h.hexdigest()}.pickle"
 
-                id_to_display_norms[cid] = norms
-                id_to_channel_xml[cid] = ET.tostring(el, encoding="utf-8").decode("utf-8", errors="ignore")
-                el.clear()
 
+def index_epg_channels(epg_path: Path) -> Tuple[Set[str], Dict[str, str]]:
+    """
+    Returns (channel_ids, name_to_id) for matching; no channel XML is retained.
+    Reuses the pickled index from a previous run when the source file is unchanged.
+    """
+    try:
+        cache: Optional[Path] = index_cache_path(epg_path)
     except Exception as e:
-        logging.error("Index channels failed: %s :: %s", epg_path.name, e)
+        logging.warning("Index cache key failed: %s :: %s", epg_path.name, e)
+        cache = None
 
-    return id_to_display_norms, id_to_channel_xml
+    if cache is not None and cache.exists():
+        try:
+            channel_ids, name_to_id = pickle.loads(cache.read_bytes())
+            return channel_ids, name_to_id
+        except Exception as e:
+            # drop it, so the rescan below replaces it instead of every later run rescanning
+            logging.warning("Index cache unreadable, rebuilding: %s :: %s", epg_path.name, e)
+            try:
+                cache.unlink()
+            except OSError:
+                pass
 
+    channel_ids, name_to_id, _xml = scan_channel_header(epg_path)
 
-def build_name_to_ids(id_to_display_norms: Dict[str, List[str]]) -> Dict[str, List[str]]:
-    name_to_ids: Dict[str, List[str]] = {}
-    for cid, norms in id_to_display_norms.items():
-        for n in norms:
-            name_to_ids.setdefault(n, []).append(cid)
-    return name_to_ids
+    if cache is not None and channel_ids:
+        try:
+            # drop indexes of earlier versions of this source, then publish atomically
+            for old in INDEX_CACHE_DIR.iterdir():
+                if old.name.startswith(epg_path.name + ".") and old.name.endswith(".pickle"):
+                    old.unlink()
+            part = cache.with_name(cache.name + ".part")
+            part.write_bytes(pickle.dumps((channel_ids, name_to_id), protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(part, cache)
+        except Exception as e:
+            logging.warning("Index cache write failed: %s :: %s", epg_path.name, e)
+    return channel_ids, name_to_id
 
 
 # ----------------------------
 # Output writer
 # ----------------------------
 
-def write_final_xml(
-    kept_all_ids: Set[str],
-    channel_xml_by_id: Dict[str, str],
-    per_source_assignments: Dict[Path, Set[str]],
-) -> None:
-    if TMP_XML.exists():
-        TMP_XML.unlink()
-
-    with TMP_XML.open("w", encoding="utf-8", newline="\n") as out:
-        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-        out.write("<tv>\n")
-
-        # channels
-        for cid in sorted(kept_all_ids):
-            ch_xml = channel_xml_by_id.get(cid)
-            if ch_xml:
-                out.write(ch_xml)
-                out.write("\n")
-
-        # programmes
-        for epg_path, ids in per_source_assignments.items():
-            if not ids:
-                continue
+def byte_scannable(encoding: str) -> bool:
+    """True for encodings where "<programme" and attribute quotes are plain ASCII bytes."""
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return False
+    return name in ("utf-8", "ascii") or name.startswith(("iso8859-", "cp125"))
+
+
+def scan_programme_blocks(f, ids: FrozenSet[str], encoding: str, emit) -> Optional[bytes]:
+    """
+    Byte-level pass over a stream of <programme> elements: emit(raw_block) for every element
+    whose channel is in `ids`, without building any element objects.
+
+    Returns:
+      None once </tv> or EOF is reached, otherwise the unconsumed bytes (starting at an element
+      boundary) at the first input the scanner does not recognize, for iterparse to finish.
+    """
+    buf = b""
+    pos = 0
+    eof = False
+    while True:
+        pos = PROGRAMME_GAP_RX.match(buf, pos).end()
+        m = PROGRAMME_BLOCK_RX.match(buf, pos)
+        if m is None:
+            head = buf[pos:pos + 10]
+            if head.startswith(b"</tv"):
+                return None
+            if eof:
+                return buf[pos:] if head else None
+            if len(head) == 10 and not head.startswith((b"<programme", b"<!--")):
+                return buf[pos:]
+            if len(buf) - pos > PROGRAMME_SCAN_LIMIT:
+                return buf[pos:]
+            chunk = f.read(READ_CHUNK)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+
+        pos = m.end()
+        cm = PROGRAMME_CHANNEL_RX.search(m.group(1))
+        if cm is None:
+            continue
+        raw = cm.group(1) if cm.group(1) is not None else cm.group(2)
+        cid = raw.decode(encoding, errors="replace")
+        if "&" in cid:
+            cid = html.unescape(cid)
+        if cid in ids or cid.strip() in ids:
+            emit(m.group(0))
+
+
+def extract_source(epg_path: Path, ids: FrozenSet[str], channels_path: Path, part_path: Path) -> None:
+    """
+    Write the raw <channel> xml of `ids` to channels_path and the <programme> elements whose
+    channel is in `ids` to part_path, in a single read of the source.
+    Programmes are copied through as raw bytes by scan_programme_blocks; iterparse only takes
+    over for encodings the byte scanner cannot handle or from the first input it does not
+    recognize onwards.
+    Runs in a worker process; never raises.
+    """
+    # binary, 1 MiB buffer: programmes go straight to disk in large writes
+    with part_path.open("wb", buffering=WRITE_BUFFER) as out:
+
+        def write_programmes(body, encoding: Optional[str]) -> None:
+            batch: List[bytes] = []
+            batch_bytes = 0
+
+            def emit(xml: bytes) -> None:
+                nonlocal batch_bytes
+                batch.append(xml)
+                batch_bytes += len(xml)
+                if batch_bytes >= PROGRAMME_BATCH:
+                    out.write(b"\n".join(batch) + b"\n")
+                    batch.clear()
+                    batch_bytes = 0
+
             try:
-                with open_xml_stream(epg_path) as f:
-                    for _ev, el in ET.iterparse(f, events=("end",)):
-                        if el.tag == "programme":
-                            cid = (el.attrib.get("channel", "") or "").strip()
-                            if cid in ids:
-                                out.write(ET.tostring(el, encoding="utf-8").decode("utf-8", errors="ignore"))
-                                out.write("\n")
-                            el.clear()
-                        elif el.tag == "channel":
-                            el.clear()
+                if encoding is None:
+                    # not ASCII-compatible (UTF-16/32): body is the whole document, parsed as is
+                    source = body
+                else:
+                    rest = b""
+                    if byte_scannable(encoding):
+                        if codecs.lookup(encoding).name in ("utf-8", "ascii"):
+                            rest = scan_programme_blocks(body, ids, encoding, emit)
+                        else:
+                            # raw bytes are in the source encoding; the output document is utf-8
+                            rest = scan_programme_blocks(
+                                body, ids, encoding,
+                                lambda xml: emit(xml.decode(encoding, errors="ignore").encode("utf-8")),
+                            )
+                        if rest is None:
+                            return
+                    prolog = f'<?xml version="1.0" encoding="{encoding}"?>\n<tv>\n'.encode("ascii")
+                    source = _ResumedStream(prolog + rest, body)
+                for el in iter_elements(source, ("programme",)):
+                    cid = el.get("channel")
+                    if cid is None:
+                        continue
+                    if cid in ids or cid.strip() in ids:
+                        el.tail = None  # whatever whitespace the parser has read so far
+                        emit(ET.tostring(el, encoding="utf-8"))
             except Exception as e:
                 logging.error("Programme extract failed: %s :: %s", epg_path.name, e)
+            finally:
+                if batch:
+                    out.write(b"\n".join(batch) + b"\n")
 
-        out.write("</tv>\n")
+        _ids, _names, channel_xml = scan_channel_header(epg_path, ids, on_body=write_programmes)
 
+    # document order; a repeated id keeps its last definition, as before
+    with channels_path.open("wb") as out:
+        if channel_xml:
+            out.write(b"\n".join(channel_xml.values()) + b"\n")
 
-def gzip_output() -> None:
-    if OUT_GZ.exists():
-        OUT_GZ.unlink()
-    with TMP_XML.open("rb") as f_in, gzip.open(OUT_GZ, "wb") as f_out:
-        while True:
-            chunk = f_in.read(1024 * 256)
-            if not chunk:
-                break
-            f_out.write(chunk)
+
+@contextmanager
+def open_gz_sink(path: Path):
+    """
+    Binary writer that deflates straight into `path`, using the fastest available deflate:
+    ISA-L threaded igzip, then pigz (parallel, fed through a pipe), then stdlib gzip.
+    """
+    threads = os.cpu_count() or 1
+    pigz = shutil.which("pigz")
+
+    if igzip_threaded is not None:
+        # ISA-L level 1 compresses about like zlib -6 at several times the speed
+        with igzip_threaded.open(path, "wb", compresslevel=1, threads=threads) as f_out:
+            yield f_out
+    elif pigz:
+        with path.open("wb") as f_out:
+            proc = subprocess.Popen([pigz, "-p", str(threads), "-c"], stdin=subprocess.PIPE, stdout=f_out)
+            try:
+                yield proc.stdin
+            finally:
+                proc.stdin.close()
+                rc = proc.wait()
+            if rc:
+                raise subprocess.CalledProcessError(rc, pigz)
+    else:
+        # level 6 (as pigz/gzip default); the BufferedWriter turns many small element writes
+        # into few large GzipFile.write calls, each of which pays per-call zlib/CRC overhead
+        with io.BufferedWriter(gzip.GzipFile(path, "wb", compresslevel=6), buffer_size=WRITE_BUFFER) as f_out:
+            yield f_out
+
+
+def write_final_xml(channel_to_source: Dict[str, Path]) -> None:
+    """
+    Stream the curated XMLTV document straight into OUT_GZ (no uncompressed temp copy).
+    Written to a .part file first and swapped in with os.replace, so a failed run never
+    leaves a truncated curated_epg.xml.gz behind.
+    """
+    # each channel comes from exactly one source; dict order is source priority order
+    by_source: Dict[Path, Set[str]] = {}
+    for cid, epg_path in channel_to_source.items():
+        by_source.setdefault(epg_path, set()).add(cid)
+
+    # channels and programmes: two part files per source, extracted in parallel, concatenated
+    # in source order (all channels first, as XMLTV requires); nothing is held in memory here
+    sources = [(p, frozenset(ids)) for p, ids in by_source.items()]
+    channel_parts = [TEMP_DIR / f"{p.name}.channels.xml" for p, _ids in sources]
+    programme_parts = [TEMP_DIR / f"{p.name}.programmes.xml" for p, _ids in sources]
+    parts = channel_parts + programme_parts
+    part_gz = OUT_GZ.with_name(OUT_GZ.name + ".part")
+    try:
+        run_per_source(
+            extract_source,
+            [p for p, _ids in sources],
+            [ids for _p, ids in sources],
+            channel_parts,
+            programme_parts,
+        )
+
+        with open_gz_sink(part_gz) as out:
+            out.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+            out.write(b"<tv>\n")
+
+            # raw source bytes, never re-serialized (part files are already utf-8)
+            for part in parts:
+                if part.exists():
+                    with part.open("rb") as f:
+                        shutil.copyfileobj(f, out, COPY_CHUNK)
+
+            out.write(b"</tv>\n")
+        os.replace(part_gz, OUT_GZ)
+    finally:
+        for part in parts:
+            if part.exists():
+                part.unlink()
+        if part_gz.exists():
+            part_gz.unlink()
 
 
 # ----------------------------
@@ -340,6 +937,7 @@ def main() -> int:
     vcfg = cfg.get("validation", {}) or {}
     timeout = int((vcfg.get("deep", {}) or {}).get("timeout_sec", 10))
     retries = int((vcfg.get("deep", {}) or {}).get("retries", 2))
+    ttl_sec = int(vcfg.get("cache_ttl_sec", CACHE_TTL_SEC))
 
     epg_urls = ((cfg.get("sources", {}) or {}).get("epg") or [])
     if not epg_urls:
@@ -352,12 +950,17 @@ def main() -> int:
     total_targets = max(1, len(wanted_ids) + len(wanted_names))
     logging.info("Targets: tvg-id=%d, name=%d", len(wanted_ids), len(wanted_names))
 
-    # download sources (resilient)
+    # download sources (resilient, concurrent; results stay in config order)
     epg_paths: List[Path] = []
     per_url_status: List[dict] = []
 
-    for url in epg_urls:
-        p, reason = download_epg(url, user_agent=user_agent, timeout_sec=timeout, retries=retries)
+    def fetch_one(url: str) -> Tuple[Optional[Path], str]:
+        return download_epg(url, user_agent=user_agent, timeout_sec=timeout, retries=retries, ttl_sec=ttl_sec)
+
+    with ThreadPoolExecutor(max_workers=min(8, len(epg_urls))) as ex:
+        downloads = list(ex.map(fetch_one, epg_urls))
+
+    for url, (p, reason) in zip(epg_urls, downloads):
         if p:
             epg_paths.append(p)
             per_url_status.append({"url": url, "ok": True, "reason": reason, "file": p.name})
@@ -378,59 +981,45 @@ def main() -> int:
     remaining_ids = set(wanted_ids)
     remaining_names = set(wanted_names)
 
-    per_source_assignments: Dict[Path, Set[str]] = {}
-    channel_xml_by_id_global: Dict[str, str] = {}
-    kept_all_ids: Set[str] = set()
+    # channel id -> the one source its programmes are taken from (first source to match wins)
+    channel_to_source: Dict[str, Path] = {}
 
-    for epg_path in epg_paths:
+    # index every source in parallel; assignment below still walks sources in priority order
+    indexes = run_per_source(index_epg_channels, epg_paths)
+
+    for epg_path, (channel_ids, name_to_id) in zip(epg_paths, indexes):
         if not remaining_ids and not remaining_names:
             break
 
-        id_to_display_norms, id_to_channel_xml = index_epg_channels(epg_path)
-
-        for cid, xml_str in id_to_channel_xml.items():
-            if cid not in channel_xml_by_id_global:
-                channel_xml_by_id_global[cid] = xml_str
-
-        matched_ids: Set[str] = set()
-
         # tvg-id priority
-        if remaining_ids:
-            for cid in list(remaining_ids):
-                if cid in id_to_display_norms:
-                    matched_ids.add(cid)
-
-        # name fallback
-        name_to_ids = build_name_to_ids(id_to_display_norms)
-        if remaining_names:
-            for nm in list(remaining_names):
-                ids = name_to_ids.get(nm)
-                if not ids:
-                    continue
-                matched_ids.add(ids[0])
+        matched_ids: Set[str] = remaining_ids & channel_ids
+
+        # name fallback (index built during the scan, lookups via set intersection)
+        matched_names = remaining_names & name_to_id.keys()
+        matched_ids.update(name_to_id[nm] for nm in matched_names)
 
         if matched_ids:
-            per_source_assignments[epg_path] = matched_ids
-            kept_all_ids |= matched_ids
+            # a name can resolve to an id an earlier source already supplies; keep that one
+            for cid in matched_ids:
+                channel_to_source.setdefault(cid, epg_path)
 
             # remove matched ids
             remaining_ids -= matched_ids
 
             # remove matched names that were satisfied by this source
-            matched_names = {nm for nm in list(remaining_names) if nm in name_to_ids}
             remaining_names -= matched_names
 
         logging.info("Assigned %d channels -> %s", len(matched_ids), epg_path.name)
 
-    if not kept_all_ids:
+    if not channel_to_source:
         add_warning(rep, "epg_no_matches_found")
         rep["epg"]["coverage"] = 0.0
         write_report(rep)
         return 2
 
     # coverage knobs
-    coverage = len(kept_all_ids) / max(1, len(wanted_ids) if wanted_ids else len(wanted_names))
-    rep["epg"]["matched_channels"] = len(kept_all_ids)
+    coverage = len(channel_to_source) / max(1, len(wanted_ids) if wanted_ids else len(wanted_names))
+    rep["epg"]["matched_channels"] = len(channel_to_source)
     rep["epg"]["target_channels"] = (len(wanted_ids) if wanted_ids else len(wanted_names))
     rep["epg"]["coverage"] = round(coverage, 4)
 
@@ -443,8 +1032,7 @@ def main() -> int:
         return 2
 
     # write outputs
-    write_final_xml(kept_all_ids, channel_xml_by_id_global, per_source_assignments)
-    gzip_output()
+    write_final_xml(channel_to_source)
     logging.info("Wrote outputs/curated_epg.xml.gz")
 
     write_report(rep)
@@ -1,13 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from functions.http import fetch
 from functions.paths import cache_path
 
 def download_all(cfg):
-    m3u_files, epg_files = [], []
+    ttl_sec = (cfg.get("validation", {}) or {}).get("cache_ttl_sec")
+    m3u_urls = list(cfg["sources"]["m3u"])
+    urls = m3u_urls + list(cfg["sources"]["epg"])
+    files = [None] * len(urls)
+
+    # cache files are keyed by URL basename: URLs sharing one (and its .part) are fetched in
+    # turn, in list order, by a single worker so no two downloads ever write the same file
+    by_dest = {}
+    for i, url in enumerate(urls):
+        by_dest.setdefault(cache_path(url), []).append(i)
 
-    for url in cfg["sources"]["m3u"]:
-        m3u_files.append(fetch(url, cache_path(url)))
+    def _fetch_in_turn(dest, indexes):
+        for i in indexes:
+            files[i] = fetch(urls[i], dest, ttl_sec=ttl_sec)
 
-    for url in cfg["sources"]["epg"]:
-        epg_files.append(fetch(url, cache_path(url)))
+    # IO-bound: every m3u and EPG source is queued up front, so both lists download together
+    # over the shared keep-alive session
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        jobs = [ex.submit(_fetch_in_turn, dest, indexes) for dest, indexes in by_dest.items()]
+        for job in jobs:
+            job.result()
 
-    return {"m3u": m3u_files, "epg": epg_files}
+    return {"m3u": files[:len(m3u_urls)], "epg": files[len(m3u_urls):]}
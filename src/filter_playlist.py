@@ -24,16 +24,45 @@ Change Log
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import re
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import requests
 import yaml
+from requests.adapters import HTTPAdapter
+
+try:
+    # libyaml-backed loader when PyYAML was built with it; same safe subset, C speed
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    # optional: Rust JSON codec for report.json (bytes out, no str round trip)
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import httpx  # optional: async validation sweep
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (optional: lets httpx multiplex probes over HTTP/2)
+    HAVE_H2 = True
+except ImportError:
+    HAVE_H2 = False
 
 __app__ = "StreamLedger"
 __component__ = "filter_playlist"
@@ -49,8 +78,21 @@ CACHE_DIR.mkdir(exist_ok=True)
 OUTPUTS_DIR.mkdir(exist_ok=True)
 LOGS_DIR.mkdir(exist_ok=True)
 
+COPY_CHUNK = 1024 * 1024
+CACHE_TTL_SEC = 6 * 3600  # default for validation.cache_ttl_sec
 
-@dataclass
+# Downloads + stream probes: one keep-alive session shared by all threads (most stream URLs sit
+# on a handful of CDN hosts); stream_alive does its own retries, so the adapter does none.
+VALIDATION_WORKERS = 32
+VALIDATION_PER_HOST = 8  # probes in flight against any one host
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = "StreamLedger"  # main() sets pipeline.user_agent
+_ADAPTER = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
+
+@dataclass(slots=True)
 class Channel:
     extinf_raw: str
     url: str
@@ -58,6 +100,32 @@ class Channel:
     tvg_name: str
     group_title: str
     name: str
+    # derived once at parse time for dedupe / overrides / scoring / final ordering
+    key: str = field(init=False, repr=False, compare=False)
+    name_key: str = field(init=False, repr=False, compare=False)
+    score: int = field(init=False, repr=False, compare=False)
+    sort_key: Tuple[str, str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # stable dedupe key: prefer tvg-id, else tvg-name, else display name
+        self.key = normalize(self.tvg_id or self.tvg_name or self.name)
+        self.name_key = normalize(self.tvg_name or self.name)
+        # dedupe score: transport first, then metadata completeness
+        if self.url.startswith("https://"):
+            self.score = 200
+        elif self.url.startswith("http://"):
+            self.score = 100
+        else:
+            self.score = 0
+        if self.tvg_id:
+            self.score += 25
+        if self.tvg_name:
+            self.score += 10
+        self.sort_key = (
+            (self.tvg_name or self.name).lower(),
+            (self.group_title or "").lower(),
+            self.url.lower(),
+        )
 
 
 # ----------------------------
@@ -66,83 +134,190 @@ class Channel:
 
 def load_yaml(path: Path) -> dict:
     with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+        return yaml.load(f, Loader=YamlLoader) or {}
 
 
 def write_json(path: Path, obj: dict) -> None:
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
     path.write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
 
 
-def _attr(extinf: str, attr: str) -> str:
-    m = re.search(rf'{attr}="([^"]*)"', extinf)
-    return m.group(1).strip() if m else ""
+# An #EXTINF line and the first http(s) URL line after it; other lines in between (#EXTVLCOPT,
+# blanks, non-http URLs) are skipped, and a later #EXTINF starts a new entry instead.
+_LINE_BREAK = r"(?:\r\n|\r|\n)"
+_EXTINF_URL_RX = re.compile(
+    r"^[ \t]*(#EXTINF[^\r\n]*)"
+    rf"(?:{_LINE_BREAK}(?![ \t]*(?:#EXTINF|https?://))[^\r\n]*)*"
+    rf"{_LINE_BREAK}[ \t]*(https?://[^\r\n]*)",
+    re.M,
+)
+# The three attributes we read, collected in one scan of the #EXTINF line
+_EXTINF_ATTR_RX = re.compile(r'(tvg-id|tvg-name|group-title)="([^"]*)"')
+
+
+def _attrs(extinf: str) -> Dict[str, str]:
+    """First value of each of tvg-id / tvg-name / group-title on the line."""
+    found: Dict[str, str] = {}
+    for m in _EXTINF_ATTR_RX.finditer(extinf):
+        found.setdefault(m.group(1), m.group(2))
+    return found
+
+
+def _meta_path(fn: Path) -> Path:
+    """Sidecar holding the HTTP validators (ETag / Last-Modified) of a cached download."""
+    return fn.with_name(fn.name + ".meta")
 
 
-def download_text(url: str, ua: str, timeout_sec: int) -> Path:
-    """Cache-by-filename download. Keeps runs fast and deterministic."""
+def _load_validators(fn: Path) -> dict:
+    try:
+        return json.loads(_meta_path(fn).read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def download_text(
+    url: str, ua: str, timeout_sec: int, ttl_sec: int = CACHE_TTL_SEC
+) -> Tuple[Path, Optional[bytes]]:
+    """
+    Cache-by-filename download. A cached copy younger than ttl_sec is used without a request;
+    an older one is revalidated with a conditional GET (304 = keep it, restart the TTL), and is
+    still used if the source cannot be reached.
+    Returns (cache_path, body): body is the freshly downloaded content, so the caller can parse
+    it without reading the file back; None when the cached copy is served.
+    """
     fn = CACHE_DIR / Path(url).name
-    if fn.exists() and fn.stat().st_size > 0:
-        return fn
-    r = requests.get(url, timeout=timeout_sec, headers={"User-Agent": ua})
-    r.raise_for_status()
-    fn.write_text(r.text, encoding="utf-8")
-    return fn
+    try:
+        st = fn.stat()
+        cached = st.st_size > 0
+    except FileNotFoundError:
+        cached = False
+    if cached and time.time() - st.st_mtime < ttl_sec:
+        return fn, None
+
+    headers = {"User-Agent": ua, "Accept-Encoding": "gzip"}
+    if cached:
+        validators = _load_validators(fn)
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    # stream the body to disk (gzip transfer is inflated on the fly) while keeping the chunks
+    # for the parser; the cache file only appears once complete
+    part = fn.with_name(fn.name + ".part")
+    chunks: List[bytes] = []
+    try:
+        with SESSION.get(url, timeout=timeout_sec, headers=headers, stream=True) as r:
+            if r.status_code == 304 and cached:
+                os.utime(fn)
+                return fn, None
+            r.raise_for_status()
+            r.raw.decode_content = True
+            with part.open("wb") as f:
+                for chunk in iter(partial(r.raw.read, COPY_CHUNK), b""):
+                    f.write(chunk)
+                    chunks.append(chunk)
+            meta = {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+        os.replace(part, fn)
+    except Exception:
+        if cached:
+            return fn, None  # stale beats nothing
+        raise
+    finally:
+        if part.exists():
+            part.unlink()
 
+    if meta["etag"] or meta["last_modified"]:
+        _meta_path(fn).write_text(json.dumps(meta), encoding="utf-8")
+    else:
+        _meta_path(fn).unlink(missing_ok=True)
+    return fn, b"".join(chunks)
 
-def parse_m3u(path: Path) -> List[Channel]:
-    """Parse #EXTINF + URL pairs."""
+
+def parse_m3u(path: Path, data: Optional[bytes] = None) -> List[Channel]:
+    """Parse #EXTINF + URL pairs (one regex scan over the whole file, or over `data` if given)."""
     out: List[Channel] = []
-    current_extinf: Optional[str] = None
-    for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        if line.startswith("#EXTINF"):
-            current_extinf = line
-            continue
-        if current_extinf and (line.startswith("http://") or line.startswith("https://")):
-            ext = current_extinf
-            out.append(
-                Channel(
-                    extinf_raw=ext,
-                    url=line,
-                    tvg_id=_attr(ext, "tvg-id"),
-                    tvg_name=_attr(ext, "tvg-name"),
-                    group_title=_attr(ext, "group-title"),
-                    name=ext.split(",", 1)[-1].strip(),
-                )
+    if data is None:
+        text = path.read_text(encoding="utf-8", errors="ignore")
+    else:
+        # same newline handling as text-mode reads: "^" only anchors after "\n"
+        text = data.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+    for m in _EXTINF_URL_RX.finditer(text):
+        ext = m.group(1).strip()
+        attrs = _attrs(ext)
+        out.append(
+            Channel(
+                extinf_raw=ext,
+                url=m.group(2).strip(),
+                tvg_id=attrs.get("tvg-id", "").strip(),
+                tvg_name=attrs.get("tvg-name", "").strip(),
+                group_title=attrs.get("group-title", "").strip(),
+                name=ext[ext.find(",") + 1:].strip(),  # after the first comma, or the whole line
             )
-            current_extinf = None
+        )
     return out
 
 
-def normalize(s: str) -> str:
-    return re.sub(r"\W+", "", (s or "").lower())
+_NON_WORD_RX = re.compile(r"\W+")
+# ASCII chars \W matches (everything but letters, digits and "_"), deleted via str.translate
+_NORMALIZE_DROP = str.maketrans({chr(c): None for c in range(128) if not (chr(c).isalnum() or chr(c) == "_")})
 
 
-def canonical_key(ch: Channel) -> str:
-    """Stable key for dedupe: prefer tvg-id, else tvg-name, else display name."""
-    return normalize(ch.tvg_id or ch.tvg_name or ch.name)
+@lru_cache(maxsize=65536)
+def normalize(s: str) -> str:
+    s = (s or "").lower()
+    if s.isascii():
+        return s.translate(_NORMALIZE_DROP)
+    return _NON_WORD_RX.sub("", s)
 
 
 # ----------------------------
 # Matching rules
 # ----------------------------
 
-def compile_regex_list(patterns: List[str]) -> List[re.Pattern]:
-    return [re.compile(p, re.IGNORECASE) for p in (patterns or [])]
+_LEADING_FLAGS_RX = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+
+def compile_regex_list(patterns: List[str]) -> Optional[re.Pattern]:
+    """
+    Compile a pattern list into ONE case-insensitive alternation, so each name is scanned once
+    no matter how many patterns there are. Returns None for an empty list.
+
+    A leading global flag group such as "(?i)" is rewritten to a scoped one, since global flags
+    are only legal at the very start of the combined expression. Patterns must not use numbered
+    backreferences or repeat a group name, and should avoid unanchored ".*...*" pairs, which
+    make every alternative backtrack over the whole name.
+    """
+    parts = []
+    for p in patterns or []:
+        m = _LEADING_FLAGS_RX.match(p)
+        parts.append(f"(?{m.group(1)}:{p[m.end():]})" if m else f"(?:{p})")
+    if not parts:
+        return None
+    return re.compile("|".join(parts), re.IGNORECASE)
+
 
+def compile_token_list(tokens: List[str]) -> Optional[re.Pattern]:
+    """Literal substring tokens as one alternation; match against lowercased text."""
+    tokens = [t.lower() for t in (tokens or [])]
+    if not tokens:
+        return None
+    return re.compile("|".join(re.escape(t) for t in tokens))
 
-def matches_any(rx_list: List[re.Pattern], text: str) -> bool:
-    return bool(text) and any(rx.search(text) for rx in rx_list)
+
+def matches_any(rx: Optional[re.Pattern], text: str) -> bool:
+    return bool(text) and rx is not None and rx.search(text) is not None
 
 
 def match_channel(
     ch: Channel,
     cfg: dict,
-    rx_ex_name: List[re.Pattern],
-    rx_in_net: List[re.Pattern],
-    rx_in_spec: List[re.Pattern],
+    rx_ex_name: Optional[re.Pattern],
+    rx_in_net: Optional[re.Pattern],
+    rx_in_spec: Optional[re.Pattern],
+    rx_news_allow: Optional[re.Pattern] = None,
 ) -> bool:
     """
     Decide if a channel qualifies *before* manual overrides.
@@ -159,10 +334,9 @@ def match_channel(
     if matches_any(rx_ex_name, name):
         return False
 
-    # News allow-only whitelist
-    for token in (cfg.get("include", {}).get("news_allow_only") or []):
-        if token.lower() in name.lower():
-            return True
+    # News allow-only whitelist (tokens are lowercased literals)
+    if rx_news_allow is not None and rx_news_allow.search(name.lower()):
+        return True
 
     # Network/specialty match
     if matches_any(rx_in_net, name):
@@ -188,7 +362,6 @@ def stream_alive(url: str, mode: str, cfg: dict) -> Tuple[bool, str]:
         return True, "validation=none"
 
     vcfg = cfg.get("validation", {})
-    ua = cfg.get("pipeline", {}).get("user_agent", "StreamLedger")
     soft_403_405 = bool(vcfg.get("soft_alive_on_403_405", True))
 
     profile = vcfg.get("deep" if mode == "deep" else "light", {})
@@ -200,7 +373,7 @@ def stream_alive(url: str, mode: str, cfg: dict) -> Tuple[bool, str]:
 
     for _ in range(max(1, retries + 1)):
         try:
-            r = requests.head(url, timeout=timeout, allow_redirects=True, headers={"User-Agent": ua})
+            r = SESSION.head(url, timeout=timeout, allow_redirects=True)
             if r.status_code < 400:
                 return True, f"head={r.status_code}"
 
@@ -208,16 +381,16 @@ def stream_alive(url: str, mode: str, cfg: dict) -> Tuple[bool, str]:
                 return True, f"head_soft={r.status_code}"
 
             if mode == "deep" and r.status_code in (403, 405, 406):
-                gr = requests.get(
+                with SESSION.get(
                     url,
                     timeout=timeout,
                     stream=True,
                     allow_redirects=True,
-                    headers={"User-Agent": ua, "Range": f"bytes={range_bytes}"},
-                )
-                if gr.status_code < 400:
-                    return True, f"get_range={gr.status_code}"
-                return False, f"get_range_fail={gr.status_code}"
+                    headers={"Range": f"bytes={range_bytes}"},
+                ) as gr:
+                    if gr.status_code < 400:
+                        return True, f"get_range={gr.status_code}"
+                    return False, f"get_range_fail={gr.status_code}"
 
             return False, f"head_fail={r.status_code}"
 
@@ -228,6 +401,130 @@ def stream_alive(url: str, mode: str, cfg: dict) -> Tuple[bool, str]:
     return False, f"exc={type(last_exc).__name__}" if last_exc else "exc=unknown"
 
 
+async def stream_alive_async(client, url: str, mode: str, cfg: dict) -> Tuple[bool, str]:
+    """stream_alive over a shared httpx.AsyncClient; same modes, retries and reasons."""
+    if mode == "none":
+        return True, "validation=none"
+
+    vcfg = cfg.get("validation", {})
+    soft_403_405 = bool(vcfg.get("soft_alive_on_403_405", True))
+
+    profile = vcfg.get("deep" if mode == "deep" else "light", {})
+    timeout = int(profile.get("timeout_sec", 6))
+    retries = int(profile.get("retries", 1))
+    range_bytes = str(vcfg.get("deep", {}).get("range_bytes", "0-0"))
+
+    last_exc: Optional[Exception] = None
+
+    for _ in range(max(1, retries + 1)):
+        try:
+            r = await client.head(url, timeout=timeout, follow_redirects=True)
+            if r.status_code < 400:
+                return True, f"head={r.status_code}"
+
+            if mode == "light" and r.status_code in (403, 405) and soft_403_405:
+                return True, f"head_soft={r.status_code}"
+
+            if mode == "deep" and r.status_code in (403, 405, 406):
+                async with client.stream(
+                    "GET",
+                    url,
+                    timeout=timeout,
+                    follow_redirects=True,
+                    headers={"Range": f"bytes={range_bytes}"},
+                ) as gr:
+                    if gr.status_code < 400:
+                        return True, f"get_range={gr.status_code}"
+                    return False, f"get_range_fail={gr.status_code}"
+
+            return False, f"head_fail={r.status_code}"
+
+        except Exception as e:
+            last_exc = e
+            await asyncio.sleep(0.2)
+
+    return False, f"exc={type(last_exc).__name__}" if last_exc else "exc=unknown"
+
+
+def _host(url: str) -> str:
+    try:
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+
+def bucket_by_host(urls: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Returns (dispatch order, url -> host).
+    The order deals URLs round-robin across hosts, so the pool never lines up a long run
+    of probes against one CDN while other hosts sit idle.
+    """
+    hosts: Dict[str, str] = {}
+    buckets: Dict[str, List[str]] = {}
+    for u in urls:
+        h = hosts[u] = _host(u)
+        buckets.setdefault(h, []).append(u)
+
+    order: List[str] = []
+    lanes = list(buckets.values())
+    for i in range(max(map(len, lanes), default=0)):
+        order.extend(lane[i] for lane in lanes if i < len(lane))
+    return order, hosts
+
+
+async def _validate_async(
+    urls: List[str], hosts: Dict[str, str], mode: str, cfg: dict, workers: int, per_host: int
+) -> Dict[str, Tuple[bool, str]]:
+    limits = httpx.Limits(max_connections=workers, max_keepalive_connections=workers)
+    sem = asyncio.Semaphore(workers)
+    host_sems = {h: asyncio.Semaphore(per_host) for h in set(hosts.values())}
+
+    async with httpx.AsyncClient(
+        http2=HAVE_H2, limits=limits, headers={"User-Agent": SESSION.headers["User-Agent"]}
+    ) as client:
+
+        async def check(url: str) -> Tuple[bool, str]:
+            # host slot first: a probe queued behind a busy host does not hold a global slot
+            async with host_sems[hosts[url]], sem:
+                return await stream_alive_async(client, url, mode, cfg)
+
+        results = await asyncio.gather(*(check(u) for u in urls))
+    return dict(zip(urls, results))
+
+
+def validate_urls(urls: List[str], mode: str, cfg: dict) -> Dict[str, Tuple[bool, str]]:
+    """
+    Returns url -> (alive, reason) for distinct urls.
+    With httpx installed, one event loop sweeps them (HTTP/2 multiplexing when h2 is too);
+    otherwise stream_alive runs on a thread pool over the shared requests session.
+    Either way at most validation.per_host_concurrency probes hit one host at a time.
+    """
+    if mode == "none":
+        return {u: stream_alive(u, mode=mode, cfg=cfg) for u in urls}
+    if not urls:
+        return {}
+
+    vcfg = cfg.get("validation", {})
+    workers = max(1, min(int(vcfg.get("concurrency", VALIDATION_WORKERS)), len(urls)))
+    per_host = max(1, int(vcfg.get("per_host_concurrency", VALIDATION_PER_HOST)))
+    order, hosts = bucket_by_host(urls)
+    if httpx is not None:
+        return asyncio.run(_validate_async(order, hosts, mode, cfg, workers, per_host))
+
+    host_sems = {h: threading.BoundedSemaphore(per_host) for h in set(hosts.values())}
+
+    def probe(url: str) -> Tuple[bool, str]:
+        with host_sems[hosts[url]]:
+            return stream_alive(url, mode, cfg)
+
+    verdicts: Dict[str, Tuple[bool, str]] = {}
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(probe, u): u for u in order}
+        for fut in as_completed(futures):
+            verdicts[futures[fut]] = fut.result()
+    return verdicts
+
+
 # ----------------------------
 # Manual overrides (final authority)
 # ----------------------------
@@ -267,16 +564,22 @@ def apply_overrides(
     ex_names = set(normalize(x) for x in (ov.get("exclude_names") or []))
     in_names = set(normalize(x) for x in (ov.get("include_names") or []))
     ex_rx = compile_regex_list(ov.get("exclude_name_regex") or [])
-    in_rx = compile_regex_list(ov.get("include_name_regex") or [])
+    # include regexes: one fused scan per channel; the single patterns only serve the
+    # per-pattern "not found" report, and are only run against the channels the union matched
+    in_patterns = list(ov.get("include_name_regex") or [])
+    in_rx = compile_regex_list(in_patterns)
 
-    # 1) exclusions
+    # 1) exclusions (set lookups per channel; skipped when no exclude rules are configured)
     removed = 0
-    for key in list(channels_by_key.keys()):
-        ch = channels_by_key[key]
-        nm = normalize(ch.tvg_name or ch.name)
-        if (ch.tvg_id and ch.tvg_id in ex_ids) or (nm in ex_names) or matches_any(ex_rx, ch.tvg_name or ch.name):
-            del channels_by_key[key]
-            removed += 1
+    if ex_ids or ex_names or ex_rx is not None:
+        for key, ch in list(channels_by_key.items()):
+            if (
+                (ch.tvg_id and ch.tvg_id in ex_ids)
+                or ch.name_key in ex_names
+                or matches_any(ex_rx, ch.tvg_name or ch.name)
+            ):
+                del channels_by_key[key]
+                removed += 1
 
     report.setdefault("overrides", {})
     report["overrides"]["excluded_removed"] = removed
@@ -288,40 +591,41 @@ def apply_overrides(
     def candidates_for_include() -> List[Channel]:
         return all_channels
 
-    for target_id in in_ids:
-        found = None
+    # first candidate per tvg-id / normalized name, built in one pass instead of one scan per target
+    first_by_id: Dict[str, Channel] = {}
+    first_by_name: Dict[str, Channel] = {}
+    if in_ids or in_names:
         for ch in candidates_for_include():
-            if ch.tvg_id == target_id:
-                found = ch
-                break
+            first_by_id.setdefault(ch.tvg_id, ch)
+            first_by_name.setdefault(ch.name_key, ch)
+
+    for target_id in in_ids:
+        found = first_by_id.get(target_id)
         if not found:
             not_found.append(f"include_tvg_id:{target_id}")
             continue
-        channels_by_key[canonical_key(found)] = found
+        channels_by_key[found.key] = found
         added += 1
 
     for target_name in in_names:
-        found = None
-        for ch in candidates_for_include():
-            nm = normalize(ch.tvg_name or ch.name)
-            if nm == target_name:
-                found = ch
-                break
+        found = first_by_name.get(target_name)
         if not found:
             not_found.append(f"include_name:{target_name}")
             continue
-        channels_by_key[canonical_key(found)] = found
+        channels_by_key[found.key] = found
         added += 1
 
-    for rx in in_rx:
-        found_any = False
+    if in_rx is not None:
+        matched_names: List[str] = []
         for ch in candidates_for_include():
-            nm_raw = ch.tvg_name or ch.name
-            if rx.search(nm_raw or ""):
-                channels_by_key[canonical_key(ch)] = ch
-                found_any = True
-        if not found_any:
-            not_found.append(f"include_name_regex:{rx.pattern}")
+            nm_raw = ch.tvg_name or ch.name or ""
+            if in_rx.search(nm_raw):
+                channels_by_key[ch.key] = ch
+                matched_names.append(nm_raw)
+        for p in in_patterns:
+            rx = re.compile(p, re.IGNORECASE)
+            if not any(rx.search(nm) for nm in matched_names):
+                not_found.append(f"include_name_regex:{p}")
 
     report["overrides"]["included_added"] = added
     if not_found:
@@ -342,49 +646,45 @@ def main() -> None:
         mode = "light"
 
     ua = cfg.get("pipeline", {}).get("user_agent", "StreamLedger")
+    SESSION.headers["User-Agent"] = ua
     timeout_dl = int(cfg.get("validation", {}).get("light", {}).get("timeout_sec", 6))
+    ttl_sec = int(cfg.get("validation", {}).get("cache_ttl_sec", CACHE_TTL_SEC))
 
     rx_ex_name = compile_regex_list(cfg.get("exclude", {}).get("name_regex", []))
     rx_in_net = compile_regex_list(cfg.get("include", {}).get("networks", []))
     rx_in_spec = compile_regex_list(cfg.get("include", {}).get("specialty", []))
+    rx_news_allow = compile_token_list(cfg.get("include", {}).get("news_allow_only", []))
 
-    # Download + parse
+    # Download (concurrently; network-bound) + parse in source order as each one lands
     all_channels: List[Channel] = []
-    for url in (cfg.get("sources", {}).get("m3u") or []):
-        src_path = download_text(url, ua=ua, timeout_sec=timeout_dl)
-        all_channels.extend(parse_m3u(src_path))
+    m3u_urls = cfg.get("sources", {}).get("m3u") or []
+    if m3u_urls:
+        with ThreadPoolExecutor(max_workers=min(8, len(m3u_urls))) as ex:
+            fetch = partial(download_text, ua=ua, timeout_sec=timeout_dl, ttl_sec=ttl_sec)
+            for src_path, body in ex.map(fetch, m3u_urls):
+                all_channels.extend(parse_m3u(src_path, body))
 
     # Candidate filter
-    candidates: List[Channel] = [ch for ch in all_channels if match_channel(ch, cfg, rx_ex_name, rx_in_net, rx_in_spec)]
-
-    # Dedupe scoring
-    def score(ch: Channel) -> int:
-        s = 0
-        if ch.url.startswith("https://"):
-            s += 200
-        elif ch.url.startswith("http://"):
-            s += 100
-        if ch.tvg_id:
-            s += 25
-        if ch.tvg_name:
-            s += 10
-        return s
+    candidates: List[Channel] = [
+        ch for ch in all_channels if match_channel(ch, cfg, rx_ex_name, rx_in_net, rx_in_spec, rx_news_allow)
+    ]
 
+    # Dedupe (scores were computed at parse time): one setdefault per channel; the first channel
+    # per key stays unless a later one scores strictly higher (keys keep first-seen order)
     selected: Dict[str, Channel] = {}
-    selected_score: Dict[str, int] = {}
     for ch in candidates:
-        k = canonical_key(ch)
-        sc = score(ch)
-        if k not in selected or sc > selected_score[k]:
-            selected[k] = ch
-            selected_score[k] = sc
+        if selected.setdefault(ch.key, ch).score < ch.score:
+            selected[ch.key] = ch
 
-    # Validation
+    # Validation (network-bound: each distinct URL is probed once, concurrently; results are
+    # tallied in selection order so the report does not depend on completion order)
     alive: Dict[str, Channel] = {}
     validation_stats = {"alive": 0, "dead": 0, "soft": 0, "reasons": {}}
 
+    verdicts = validate_urls(list(dict.fromkeys(ch.url for ch in selected.values())), mode, cfg)
+
     for k, ch in selected.items():
-        ok, reason = stream_alive(ch.url, mode=mode, cfg=cfg)
+        ok, reason = verdicts[ch.url]
         validation_stats["reasons"][reason] = validation_stats["reasons"].get(reason, 0) + 1
         if ok:
             alive[k] = ch
@@ -418,23 +718,15 @@ def main() -> None:
     max_channels = int(cfg.get("pipeline", {}).get("max_channels", 750))
     min_channels = int(cfg.get("pipeline", {}).get("min_channels", 400))
 
-    ordered = sorted(
-        alive.values(),
-        key=lambda c: (
-            -score(c),
-            (c.tvg_name or c.name).lower(),
-            (c.group_title or "").lower(),
-            c.url.lower(),
-        ),
-    )
+    ordered = sorted(alive.values(), key=lambda ch: (-ch.score, ch.sort_key))
     final_list = ordered[:max_channels]
 
     # Write M3U
     out = OUTPUTS_DIR / "curated.m3u"
-    with out.open("w", encoding="utf-8") as f:
+    with out.open("w", encoding="utf-8", buffering=COPY_CHUNK) as f:
         f.write("#EXTM3U\n")
-        for ch in final_list:
-            f.write(f"{ch.extinf_raw}\n{ch.url}\n")
+        # generator into writelines: entries reach the 1 MiB buffer without a per-channel write call
+        f.writelines(f"{ch.extinf_raw}\n{ch.url}\n" for ch in final_list)
 
     # Warnings only (no failure)
     report["counts"]["final_written"] = len(final_list)
@@ -449,12 +741,14 @@ def main() -> None:
     print(f"Wrote report → {OUTPUTS_DIR / 'report.json'}")
 
 
-if __name__ == "__main__":
+def run() -> int:
+    """
+    main() with the script's exit contract, for callers running the step in-process.
+    Returns 0 on success; on a fatal error writes logs/filter_playlist.error.json and returns 2.
+    """
     try:
         main()
-        raise SystemExit(0)
-    except SystemExit:
-        raise
+        return 0
     except Exception as e:
         err = {
             "timestamp_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
@@ -465,4 +759,8 @@ if __name__ == "__main__":
         }
         write_json(LOGS_DIR / "filter_playlist.error.json", err)
         print(f"FATAL: {type(e).__name__}: {e}", file=os.sys.stderr)
-        raise SystemExit(2)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(run())
@@ -12,29 +12,39 @@ import logging
 import yaml
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as YamlLoader  # libyaml, when PyYAML was built with it
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 # Add project root to path for direct run from src/
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLineEdit, QLabel, QTreeWidget, QTreeWidgetItem
+    QPushButton, QLineEdit, QLabel, QTreeView
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QSortFilterProxyModel, QTimer
+from PyQt6.QtGui import QStandardItem, QStandardItemModel
 
 # Safe import after path fix
-from filter_playlist import parse_m3u
+try:
+    from src.filter_playlist import parse_m3u
+except ImportError:  # direct run: python src/gui_channel_selector.py
+    from filter_playlist import parse_m3u
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 CONFIG_DIR = Path(__file__).parent.parent / "config"
 OVERRIDES_FILE = CONFIG_DIR / "manual_overrides.yaml"
 M3U_OUTPUT = Path(__file__).parent.parent / "outputs" / "curated.m3u"
+SEARCH_DEBOUNCE_MS = 150
 
 # Rest of your original code unchanged below
 def load_overrides():
     if OVERRIDES_FILE.exists():
         with open(OVERRIDES_FILE, "r") as f:
-            return yaml.safe_load(f) or {"include": [], "exclude": []}
+            return yaml.load(f, Loader=YamlLoader) or {"include": [], "exclude": []}
     return {"include": [], "exclude": []}
 
 def save_overrides(include, exclude):
@@ -50,22 +60,37 @@ class ChannelSelector(QWidget):
         self.setWindowTitle("StreamLedger - Channel Selector")
         self.resize(1000, 700)
         self.channels = []
-        self.filtered = []
         self.overrides = load_overrides()
 
+        # all rows live in the model; the proxy filters them in C++ (no per-keystroke rebuild,
+        # and check states survive searching)
+        self.model = QStandardItemModel(0, 3, self)
+        self.model.setHorizontalHeaderLabels(["Channel", "Group", "tvg-id"])
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.proxy.setFilterKeyColumn(-1)  # match any column
+
         layout = QVBoxLayout()
 
         # Search
         search_layout = QHBoxLayout()
         search_layout.addWidget(QLabel("Search:"))
         self.search_box = QLineEdit()
-        self.search_box.textChanged.connect(self.filter_channels)
+        # coalesce a burst of keystrokes into one filter pass once typing pauses
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(SEARCH_DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._do_filter)
+        self.search_box.textChanged.connect(lambda _: self._debounce.start())
         search_layout.addWidget(self.search_box)
         layout.addLayout(search_layout)
 
         # Tree
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Channel", "Group", "tvg-id"])
+        self.tree = QTreeView()
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setModel(self.proxy)
         layout.addWidget(self.tree)
 
         # Buttons
@@ -82,38 +107,38 @@ class ChannelSelector(QWidget):
         if not M3U_OUTPUT.exists():
             logging.error(f"{M3U_OUTPUT} not found. Run pipeline first.")
             return
-        self.channels = parse_m3u(str(M3U_OUTPUT))
-        self.filter_channels()
-
-    def filter_channels(self):
-        query = self.search_box.text().lower()
-        self.tree.clear()
-        self.filtered = [
-            ch for ch in self.channels
-            if query in ch["name"].lower() or query in ch.get("group", "").lower()
-        ]
-        for ch in self.filtered:
-            item = QTreeWidgetItem([
-                ch["name"],
-                ch.get("group", ""),
-                ch.get("tvg-id", "")
-            ])
-            if ch["name"] in self.overrides["include"]:
-                item.setCheckState(0, Qt.CheckState.Checked)
-            elif ch["name"] in self.overrides["exclude"]:
-                item.setCheckState(0, Qt.CheckState.Unchecked)
-            else:
-                item.setCheckState(0, Qt.CheckState.Checked)  # default include
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
-            self.tree.addTopLevelItem(item)
+        self.channels = parse_m3u(M3U_OUTPUT)
+        self.populate()
+
+    def populate(self):
+        include = set(self.overrides.get("include") or [])
+        exclude = set(self.overrides.get("exclude") or []) - include
+        # fill a detached model, then swap it in: no per-row signals reach the proxy/view
+        model = QStandardItemModel(0, 3, self)
+        model.setHorizontalHeaderLabels(["Channel", "Group", "tvg-id"])
+        for ch in self.channels:
+            row = [QStandardItem(ch.name), QStandardItem(ch.group_title), QStandardItem(ch.tvg_id)]
+            for item in row:
+                item.setEditable(False)
+            row[0].setCheckable(True)
+            # default include; only excluded (and not also included) names start unchecked
+            row[0].setCheckState(Qt.CheckState.Unchecked if ch.name in exclude else Qt.CheckState.Checked)
+            model.appendRow(row)
+        self.proxy.setSourceModel(model)
+        self.model.deleteLater()
+        self.model = model
+
+    def _do_filter(self):
+        self.proxy.setFilterFixedString(self.search_box.text())
 
     def save(self):
+        # every channel, not just the rows the current search shows
         include = []
         exclude = []
-        for i in range(self.tree.topLevelItemCount()):
-            item = self.tree.topLevelItem(i)
-            name = item.text(0)
-            if item.checkState(0) == Qt.CheckState.Checked:
+        for i in range(self.model.rowCount()):
+            item = self.model.item(i, 0)
+            name = item.text()
+            if item.checkState() == Qt.CheckState.Checked:
                 include.append(name)
             else:
                 exclude.append(name)
@@ -1,22 +1,22 @@
-import re
-from functions.m3u import read_entries, normalize_name, match_region
+from functions.m3u import read_entries, normalize_name, build_region_index, match_region, compile_alternation
 
 def parse_and_filter_m3u(m3u_files, cfg):
     allowed = []
-    inc_net = set(cfg["include"]["networks"] + cfg["include"]["specialty"])
-    exc_rx = [re.compile(x) for x in cfg["exclude"]["channels_regex"]]
+    inc_net = tuple({n.lower() for n in cfg["include"]["networks"] + cfg["include"]["specialty"]})
+    exc_rx = compile_alternation(cfg["exclude"]["channels_regex"])
+    region_index = build_region_index(cfg["regions"])
 
     for file in m3u_files:
         for ch in read_entries(file):
             name = normalize_name(ch["name"])
 
-            if any(r.search(name) for r in exc_rx):
+            if exc_rx is not None and exc_rx.search(name):
                 continue
 
-            if not match_region(name, cfg["regions"]):
+            if not match_region(name, region_index):
                 continue
 
-            if not any(n.lower() in name.lower() for n in inc_net):
+            if not any(n in name for n in inc_net):
                 continue
 
             allowed.append(ch)
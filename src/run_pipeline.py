@@ -11,6 +11,11 @@ import logging
 import yaml
 from pathlib import Path
 
+try:
+    from yaml import CSafeLoader as YamlLoader  # libyaml, when PyYAML was built with it
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 from src.download_sources import download_all
 from src.parse_m3u import parse_and_filter_m3u
 from src.validate_streams import validate_streams
@@ -23,7 +28,7 @@ BASE_DIR = Path(__file__).parent.parent
 
 def load_config():
     with open(BASE_DIR / "config" / "streamledger.yml", "r") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=YamlLoader)
 
 def main():
     cfg = load_config()
@@ -1,8 +1,5 @@
-from functions.http import head_ok
+from functions.http import head_ok_many
 
 def validate_streams(channels, cfg):
-    out = []
-    for ch in channels:
-        if head_ok(ch["url"], cfg["validation"]):
-            out.append(ch)
-    return out
+    alive = head_ok_many((ch["url"] for ch in channels), cfg["validation"])
+    return [ch for ch in channels if alive[ch["url"]]]
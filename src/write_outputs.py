@@ -1,8 +1,33 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
 from functions.m3u import write_m3u
-from functions.epg import write_xml
+from functions.epg import write_xml_gz
 from functions.paths import outputs_path, archive_previous
 
 def write_outputs(channels, epg_xml, cfg):
-    archive_previous()
-    write_m3u(channels, outputs_path("streamledger.m3u"))
-    write_xml(epg_xml, outputs_path("streamledger_epg.xml"))
+    m3u_out = outputs_path("streamledger.m3u")
+    epg_out = outputs_path("streamledger_epg.xml.gz")
+    out_dir = os.path.dirname(m3u_out)
+    had_outputs = os.path.isdir(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    # The new files are written into a staging subdirectory while the previous outputs are
+    # archived (archive_previous only copies top-level files, so it never sees a half-written
+    # one), then renamed over the old names once both the archive and the writes are done.
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=out_dir)
+    try:
+        m3u_tmp = os.path.join(staging, os.path.basename(m3u_out))
+        epg_tmp = os.path.join(staging, os.path.basename(epg_out))
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            jobs = [ex.submit(write_m3u, channels, m3u_tmp), ex.submit(write_xml_gz, epg_xml, epg_tmp)]
+            if had_outputs:
+                jobs.append(ex.submit(archive_previous))
+        for job in jobs:
+            job.result()
+        os.replace(m3u_tmp, m3u_out)
+        os.replace(epg_tmp, epg_out)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)